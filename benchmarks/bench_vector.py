@@ -0,0 +1,71 @@
+"""Steps per second of ``VectorEmulator`` as the worker count grows.
+
+Usage::
+
+    python benchmarks/bench_vector.py ROM [--instances 64] [--steps 500]
+        [--workers 1 2 4 8] [--mode sync|async]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from pokemon_emulator.core import WRAM_START, WRAM_STOP
+from pokemon_emulator.vector import VectorEmulator
+
+
+def run(rom: str, instances: int, workers: int, steps: int, mode: str) -> float:
+    """Return instance-steps per second for one configuration."""
+    rng = np.random.default_rng(0)
+    with VectorEmulator(
+        rom,
+        instances,
+        workers,
+        mode=mode,
+        batch_workers=max(1, workers // 2),
+        ram_window=(WRAM_START, WRAM_STOP),
+    ) as env:
+        if mode == "sync":
+            env.step(np.zeros(instances, dtype=np.uint8))
+            start = time.perf_counter()
+            for _ in range(steps):
+                env.step(rng.integers(0, 256, instances, dtype=np.uint8))
+            elapsed = time.perf_counter() - start
+            return steps * instances / elapsed
+
+        env.send(np.zeros(instances, dtype=np.uint8), np.arange(instances))
+        done = 0
+        start = time.perf_counter()
+        while done < steps * instances:
+            ids, _ = env.recv()
+            done += len(ids)
+            env.send(rng.integers(0, 256, len(ids), dtype=np.uint8), ids)
+        elapsed = time.perf_counter() - start
+        return done / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rom")
+    parser.add_argument("--instances", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    cpus = os.cpu_count() or 1
+    default_workers = [w for w in (1, 2, 4, 8, 16, 32) if w <= cpus]
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'steps/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        rate = run(args.rom, args.instances, workers, args.steps, args.mode)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Reproducible performance suite with regression thresholds.
+
+Runs every benchmark against the bundled test ROM (see ``testrom.py``) and
+prints the results as JSON::
+
+    python benchmarks/suite.py [--quick] [--output results.json]
+        [--baseline benchmarks/baseline.json] [--threshold 0.2]
+        [--save-baseline benchmarks/baseline.json]
+
+With ``--baseline`` each metric is compared against the stored value and the
+process exits with status 1 if any got worse by more than ``--threshold``
+(a fraction of the baseline). A baseline from a different schema, or from a
+``--quick`` run when this one is full (or the reverse), measures a different
+workload and is refused with status 2. Baselines are host-specific; regenerate one on
+the machine that gates releases with ``--save-baseline``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+
+import numpy as np
+from testrom import write_test_rom
+
+from pokemon_emulator import (
+    WRAM_START,
+    WRAM_STOP,
+    BatchedEmulator,
+    Replay,
+    ReplayPlayer,
+    ReplayRecorder,
+)
+
+SCHEMA_VERSION = 1
+# Every benchmark observes all of work RAM, the workload baseline.json measured.
+WRAM = (WRAM_START, WRAM_STOP)
+
+
+def _best_rate(run: Callable[[], float], repeat: int) -> float:
+    """Highest of ``repeat`` throughput measurements."""
+    return max(run() for _ in range(repeat))
+
+
+def _median_ms(run: Callable[[], None], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples)
+
+
+def bench_single_fps(rom: str, frames: int, repeat: int) -> float:
+    """Frames per second of one rendered instance."""
+    actions = np.zeros(1, dtype=np.uint8)
+    with BatchedEmulator(rom, 1, ram_window=WRAM) as emu:
+
+        def run() -> float:
+            start = time.perf_counter()
+            for _ in range(frames):
+                emu.step(actions)
+            return frames / (time.perf_counter() - start)
+
+        return _best_rate(run, repeat)
+
+
+def bench_batched_steps(rom: str, instances: int, steps: int, repeat: int) -> float:
+    """Instance-steps per second of a RAM-only ``BatchedEmulator``."""
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 256, (steps, instances), dtype=np.uint8)
+    with BatchedEmulator(rom, instances, ram_window=WRAM, render=False) as emu:
+
+        def run() -> float:
+            start = time.perf_counter()
+            for step_actions in actions:
+                emu.step(step_actions)
+            return steps * instances / (time.perf_counter() - start)
+
+        return _best_rate(run, repeat)
+
+
+def bench_snapshot(rom: str, repeat: int) -> tuple[float, float]:
+    """Median save and restore latency of one instance, in milliseconds."""
+    with BatchedEmulator(rom, 1, ram_window=WRAM, render=False) as emu:
+        emu.step(np.zeros(1, dtype=np.uint8), frames=60)
+        snapshot = emu.snapshot()
+        save_ms = _median_ms(lambda: emu.snapshot().close(), repeat)
+        restore_ms = _median_ms(lambda: emu.restore(snapshot), repeat)
+    return save_ms, restore_ms
+
+
+def bench_replay_seek(
+    rom: str, frames: int, keyframe_interval: int, repeat: int, tmpdir: str
+) -> float:
+    """Median latency of seeking to random frames of a recorded replay."""
+    path = os.path.join(tmpdir, "bench.rep")
+    rng = np.random.default_rng(0)
+    with BatchedEmulator(rom, 1, ram_window=WRAM, frame_skip=4, render=False) as emu:
+        with ReplayRecorder(path, emu, keyframe_interval=keyframe_interval) as rec:
+            for _ in range(frames // 4):
+                action = rng.integers(0, 256, 1, dtype=np.uint8)
+                emu.step(action)
+                rec.record(action[0])
+    targets = iter(rng.integers(0, frames, repeat).tolist())
+    with Replay(path) as replay, ReplayPlayer(replay, rom, ram_window=WRAM) as player:
+        return _median_ms(lambda: player.seek(next(targets)), repeat)
+
+
+def run_suite(quick: bool = False) -> dict:
+    scale = 0.1 if quick else 1.0
+    frames = max(60, int(3000 * scale))
+    steps = max(20, int(500 * scale))
+    repeat = 3 if quick else 5
+    results: dict[str, dict] = {}
+
+    def record(name: str, value: float, unit: str, higher_is_better: bool) -> None:
+        results[name] = {
+            "value": value,
+            "unit": unit,
+            "higher_is_better": higher_is_better,
+        }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rom = write_test_rom(os.path.join(tmpdir, "bench.gb"))
+        record("single_fps", bench_single_fps(rom, frames, repeat), "frames/s", True)
+        for instances in (1, 8, 64):
+            rate = bench_batched_steps(rom, instances, steps, repeat)
+            record(f"batched_steps_{instances}", rate, "steps/s", True)
+        save_ms, restore_ms = bench_snapshot(rom, repeat * 4)
+        record("snapshot_save_ms", save_ms, "ms", False)
+        record("snapshot_restore_ms", restore_ms, "ms", False)
+        seek_ms = bench_replay_seek(rom, frames * 4, 600, repeat * 4, tmpdir)
+        record("replay_seek_ms", seek_ms, "ms", False)
+
+    try:
+        from importlib.metadata import version
+
+        backend = version("pyboy")
+    except Exception:
+        backend = "unknown"
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "quick": quick,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "pyboy": backend,
+        },
+        "results": results,
+    }
+
+
+def _run_kind(run: dict) -> str:
+    return "quick" if run["meta"].get("quick") else "full"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every metric that regressed by more than ``threshold``.
+
+    Raises ``ValueError`` if the two runs are not comparable.
+    """
+    if baseline.get("schema") != current["schema"]:
+        raise ValueError(
+            f"baseline schema {baseline.get('schema')} does not match "
+            f"{current['schema']}"
+        )
+    if _run_kind(baseline) != _run_kind(current):
+        raise ValueError(
+            f"cannot compare a {_run_kind(current)} run against a "
+            f"{_run_kind(baseline)} baseline"
+        )
+    regressions = []
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+        old, new = base["value"], current["results"][name]["value"]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if base["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append(
+                f"{name}: {old:.4g} -> {new:.4g} {base['unit']} "
+                f"({worse:.1%} worse, threshold {threshold:.0%})"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="short smoke run")
+    parser.add_argument("--output", help="also write the JSON results here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--save-baseline", help="write the results as a baseline")
+    args = parser.parse_args()
+
+    results = run_suite(quick=args.quick)
+    text = json.dumps(results, indent=2)
+    print(text)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(results, baseline, args.threshold)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 2
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
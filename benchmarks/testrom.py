@@ -0,0 +1,75 @@
+"""Freely redistributable Game Boy ROM for benchmarks.
+
+The ROM is assembled here from the bytes below rather than shipped as a
+binary, so it carries no third-party code or data. After boot it loops
+forever, selecting the button and D-pad rows of the joypad on alternate
+reads, folding each read into a running sum at 0xD001 and writing that sum
+across 0xC000-0xCFFF. RAM therefore depends on every input, which is what the
+replay and snapshot benchmarks and tests need to be meaningful.
+"""
+
+from __future__ import annotations
+
+import os
+
+_ROM_SIZE = 0x8000
+_ENTRY = 0x150
+_TITLE = b"PKEBENCH"
+
+
+def _program() -> bytes:
+    setup = bytes(
+        [
+            0xF3,              # di
+            0x31, 0xFE, 0xFF,  # ld sp, $FFFE
+            0x0E, 0x20,        # ld c, $20      ; P1 select, D-pad row
+        ]
+    )
+    outer = bytes([0x21, 0x00, 0xC0])  # ld hl, $C000
+    inner = bytes(
+        [
+            0x79,              # ld a, c
+            0xEE, 0x30,        # xor $30        ; swap button/D-pad row
+            0x4F,              # ld c, a
+            0xE0, 0x00,        # ldh [$00], a   ; select before every read
+            0xF0, 0x00,        # ldh a, [$00]   ; joypad
+            0x47,              # ld b, a
+            0xFA, 0x01, 0xD0,  # ld a, [$D001]
+            0x80,              # add a, b
+            0x3C,              # inc a
+            0xEA, 0x01, 0xD0,  # ld [$D001], a
+            0x22,              # ld [hl+], a
+            0x7C,              # ld a, h
+            0xFE, 0xD0,        # cp $D0
+        ]
+    )
+    back_inner = -(len(inner) + 2) & 0xFF
+    back_outer = -(len(outer) + len(inner) + 4) & 0xFF
+    return (
+        setup
+        + outer
+        + inner
+        + bytes([0x20, back_inner])  # jr nz, inner
+        + bytes([0x18, back_outer])  # jr outer
+    )
+
+
+def build_test_rom() -> bytes:
+    """The 32 KiB ROM image, with a valid header checksum."""
+    rom = bytearray(_ROM_SIZE)
+    rom[0x100:0x104] = bytes([0x00, 0xC3, _ENTRY & 0xFF, _ENTRY >> 8])  # nop; jp
+    rom[0x134 : 0x134 + len(_TITLE)] = _TITLE
+    program = _program()
+    rom[_ENTRY : _ENTRY + len(program)] = program
+    checksum = 0
+    for byte in rom[0x134:0x14D]:
+        checksum = (checksum - byte - 1) & 0xFF
+    rom[0x14D] = checksum
+    return bytes(rom)
+
+
+def write_test_rom(path: str | os.PathLike[str]) -> str:
+    """Write the ROM to ``path`` and return it as a string."""
+    with open(path, "wb") as f:
+        f.write(build_test_rom())
+    return os.fspath(path)
@@ -0,0 +1,69 @@
+"""Headless Game Boy emulation for AI agents playing Pokémon.
+
+Submodules are imported on first use of one of their names, so importing the
+package is nearly free and a worker only loads the subsystems it touches.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core import WRAM_START, WRAM_STOP, BatchedEmulator, Buttons, Observation
+    from .dataset import TrajectoryReader, TrajectoryWriter
+    from .gamestate import (
+        POKEMON_RED_BLUE,
+        AddressIndex,
+        Field,
+        StateDecoder,
+        index_for_rom,
+    )
+    from .profiling import JsonlExporter, Profiler
+    from .replay import Replay, ReplayFormatError, ReplayPlayer, ReplayRecorder
+    from .romcache import RomData
+    from .snapshot import FORMAT_VERSION, Snapshot, SnapshotFormatError
+    from .vector import VectorEmulator
+
+# Public name -> submodule defining it.
+_EXPORTS = {
+    "WRAM_START": "core",
+    "WRAM_STOP": "core",
+    "BatchedEmulator": "core",
+    "Buttons": "core",
+    "Observation": "core",
+    "TrajectoryReader": "dataset",
+    "TrajectoryWriter": "dataset",
+    "POKEMON_RED_BLUE": "gamestate",
+    "AddressIndex": "gamestate",
+    "Field": "gamestate",
+    "StateDecoder": "gamestate",
+    "index_for_rom": "gamestate",
+    "JsonlExporter": "profiling",
+    "Profiler": "profiling",
+    "Replay": "replay",
+    "ReplayFormatError": "replay",
+    "ReplayPlayer": "replay",
+    "ReplayRecorder": "replay",
+    "RomData": "romcache",
+    "FORMAT_VERSION": "snapshot",
+    "Snapshot": "snapshot",
+    "SnapshotFormatError": "snapshot",
+    "VectorEmulator": "vector",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,107 @@
+"""Thin adapter over the PyBoy Game Boy core.
+
+Everything that touches PyBoy directly lives here so the rest of the package
+only deals with packed button masks and NumPy buffers. PyBoy (and the SDL
+bindings it pulls in) is imported when the first instance is created, not
+when this module is.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import BinaryIO
+
+import numpy as np
+
+from .snapshot import SnapshotFormatError
+
+SCREEN_HEIGHT = 144
+SCREEN_WIDTH = 160
+
+# PyBoy button names in packed-mask bit order (see ``core.Buttons``).
+_BUTTON_NAMES = ("right", "left", "up", "down", "a", "b", "select", "start")
+
+
+def _pyboy_class() -> type:
+    try:
+        from pyboy import PyBoy
+    except ImportError:
+        raise ImportError(
+            "pokemon_emulator needs PyBoy as its emulation backend; "
+            "install it with `pip install pyboy`"
+        ) from None
+    return PyBoy
+
+
+class Instance:
+    """One headless game instance driven by packed button masks."""
+
+    def __init__(self, rom_path: str | os.PathLike[str]) -> None:
+        self._pyboy = _pyboy_class()(
+            os.fspath(rom_path),
+            window="null",
+            sound_emulated=False,
+            no_input=False,
+            log_level="ERROR",
+        )
+        self._pyboy.set_emulation_speed(0)
+        self._buttons = 0
+
+    @property
+    def frame_count(self) -> int:
+        return self._pyboy.frame_count
+
+    @property
+    def cycles(self) -> int:
+        """CPU clock (T-) cycles executed since power-on, 4 per M-cycle."""
+        return self._pyboy._cycles()
+
+    def set_buttons(self, mask: int) -> None:
+        """Hold exactly the buttons in ``mask`` from the next frame on."""
+        changed = mask ^ self._buttons
+        if not changed:
+            return
+        for bit, name in enumerate(_BUTTON_NAMES):
+            if changed >> bit & 1:
+                if mask >> bit & 1:
+                    self._pyboy.button_press(name)
+                else:
+                    self._pyboy.button_release(name)
+        self._buttons = mask
+
+    def tick(self, frames: int, render: bool) -> None:
+        self._pyboy.tick(frames, render, False)
+
+    def read_frame(self, out: np.ndarray) -> None:
+        """Copy the last rendered frame as RGB into ``out`` (144, 160, 3)."""
+        out[...] = self._pyboy.screen.ndarray[:, :, :3]
+
+    def read_memory(self, start: int, stop: int, out: np.ndarray) -> None:
+        # The backend returns a list of ints; packing it into bytes first is
+        # much cheaper than letting NumPy convert the list element by element.
+        out[...] = np.frombuffer(bytes(self._pyboy.memory[start:stop]), np.uint8)
+
+    def save_state(self, f: BinaryIO) -> None:
+        self._pyboy.save_state(f)
+        # PyBoy keeps the held buttons in its state; record our mask next to
+        # it so a restore needs no release/press events, which would raise a
+        # joypad interrupt the original run never saw.
+        f.write(bytes((self._buttons,)))
+
+    def load_state(self, f: BinaryIO, version: int) -> None:
+        """Load a state written under snapshot format ``version``."""
+        self._pyboy.load_state(f)
+        if version >= 2:
+            mask = f.read(1)
+            if not mask:
+                raise SnapshotFormatError("truncated snapshot entry")
+            self._buttons = mask[0]
+        else:
+            # Version 1 did not record the held buttons; release everything
+            # so the next ``set_buttons`` is absolute.
+            for name in _BUTTON_NAMES:
+                self._pyboy.button_release(name)
+            self._buttons = 0
+
+    def close(self) -> None:
+        self._pyboy.stop(save=False)
@@ -0,0 +1,279 @@
+"""Headless, batched emulator core.
+
+``BatchedEmulator`` owns ``N`` independent game instances and advances all of
+them with one ``step(actions)`` call. Observations are written into
+preallocated, contiguous NumPy buffers with a leading instance axis, so the
+per-step cost on the Python side is one loop over instances. Frames are copied
+straight out of the backend's screen buffer. RAM is not: the backend only
+hands out memory as a Python list, built per instance and per step, and that
+costs more than emulating the frame for a full WRAM window. No RAM is observed
+unless a ``ram_window`` is given, and it should cover only what is read.
+
+Each action is held for ``frame_skip`` frames. Only the last frame of a step
+is ever rendered, and only when the step asks for pixels; RAM-only steps skip
+the PPU-to-RGB conversion entirely.
+"""
+
+from __future__ import annotations
+
+import enum
+import io
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from ._backend import SCREEN_HEIGHT, SCREEN_WIDTH, Instance
+from .profiling import Profiler
+from .romcache import RomData
+from .snapshot import Snapshot
+
+#: Work RAM, the widest useful ``ram_window``.
+WRAM_START = 0xC000
+WRAM_STOP = 0xE000
+
+
+class Buttons(enum.IntFlag):
+    """Packed joypad mask, one bit per button (matches the JOYP nibbles)."""
+
+    RIGHT = 0x01
+    LEFT = 0x02
+    UP = 0x04
+    DOWN = 0x08
+    A = 0x10
+    B = 0x20
+    SELECT = 0x40
+    START = 0x80
+
+
+@dataclass(frozen=True)
+class Observation:
+    """Batched observation views.
+
+    The arrays are the emulator's own buffers and are overwritten by the next
+    ``step``; copy them if they must outlive it.
+
+    Attributes:
+        frames: ``(N, 144, 160, 3)`` uint8 RGB frames, or ``None`` if the step
+            was not rendered.
+        ram: ``(N, stop - start)`` uint8 copy of the configured RAM window;
+            ``(N, 0)`` when no window is configured.
+    """
+
+    frames: np.ndarray | None
+    ram: np.ndarray
+
+
+class BatchedEmulator:
+    """``num_instances`` headless copies of one ROM stepped in lockstep.
+
+    Args:
+        rom_path: Game Boy ROM to load into every instance.
+        num_instances: Number of independent instances.
+        ram_window: ``(start, stop)`` address range copied into ``ram`` on
+            every step, or ``None`` to observe no RAM. Cover only what the
+            policy reads (e.g. ``AddressIndex.span``): the backend hands RAM
+            out byte by byte, and copying all of WRAM costs more than
+            emulating the frame.
+        frame_skip: Frames emulated per ``step``, all with the same buttons.
+        render: Whether ``step`` produces frames unless told otherwise. Turn
+            it off for policies that only read RAM.
+        profiler: Counters to update on every step while enabled. Can also
+            be attached later by setting ``profiler``.
+    """
+
+    def __init__(
+        self,
+        rom_path: str | os.PathLike[str],
+        num_instances: int,
+        *,
+        ram_window: tuple[int, int] | None = None,
+        frame_skip: int = 1,
+        render: bool = True,
+        profiler: Profiler | None = None,
+    ) -> None:
+        if num_instances < 1:
+            raise ValueError(f"num_instances must be positive, got {num_instances}")
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip must be positive, got {frame_skip}")
+        if ram_window is not None:
+            start, stop = ram_window
+            if not 0 <= start < stop <= 0x10000:
+                raise ValueError(f"invalid ram_window {ram_window!r}")
+            ram_window = (start, stop)
+
+        self.rom_path = os.fspath(rom_path)
+        self.rom = RomData(self.rom_path)
+        self.rom_digest = self.rom.digest
+        self.num_instances = num_instances
+        self.ram_window = ram_window
+        self.frame_skip = frame_skip
+        self.render = render
+        self.profiler = profiler
+        self._instances = [Instance(self.rom_path) for _ in range(num_instances)]
+        self._frames = np.zeros(
+            (num_instances, SCREEN_HEIGHT, SCREEN_WIDTH, 3), dtype=np.uint8
+        )
+        ram_size = 0 if ram_window is None else ram_window[1] - ram_window[0]
+        self._ram = np.zeros((num_instances, ram_size), dtype=np.uint8)
+        self._observation = Observation(self._frames, self._ram)
+        self._ram_observation = Observation(None, self._ram)
+        self._rendered = False
+        self._marks = [0] * 6  # see _step_profiled
+
+    def __enter__(self) -> BatchedEmulator:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_instances
+
+    @property
+    def frame_counts(self) -> np.ndarray:
+        """Frames emulated so far, per instance."""
+        return np.fromiter(
+            (inst.frame_count for inst in self._instances),
+            dtype=np.int64,
+            count=self.num_instances,
+        )
+
+    def step(
+        self,
+        actions: np.ndarray,
+        render: bool | None = None,
+        frames: int | None = None,
+    ) -> Observation:
+        """Hold ``actions[i]`` on instance ``i`` for ``frame_skip`` frames.
+
+        Args:
+            actions: ``(N,)`` array of packed ``Buttons`` masks.
+            render: Render and return the final frame; defaults to
+                ``self.render``.
+            frames: Frames to emulate this step instead of ``frame_skip``.
+        """
+        if render is None:
+            render = self.render
+        if frames is None:
+            frames = self.frame_skip
+        elif frames < 1:
+            raise ValueError(f"frames must be positive, got {frames}")
+        actions = np.asarray(actions, dtype=np.uint8)
+        if actions.shape != (self.num_instances,):
+            raise ValueError(
+                f"expected actions of shape ({self.num_instances},), got {actions.shape}"
+            )
+        profiler = self.profiler
+        if profiler is not None and profiler.enabled:
+            return self._step_profiled(profiler, actions, render, frames)
+
+        window = self.ram_window
+        for i, inst in enumerate(self._instances):
+            inst.set_buttons(int(actions[i]))
+            inst.tick(frames, render)
+            if render:
+                inst.read_frame(self._frames[i])
+            if window is not None:
+                inst.read_memory(*window, self._ram[i])
+        self._rendered = render
+        return self.observe()
+
+    def _step_profiled(
+        self, profiler: Profiler, actions: np.ndarray, render: bool, frames: int
+    ) -> Observation:
+        """``step`` split into timed phases, one pass over instances each.
+
+        The bookkeeping values are kept in ``self._marks`` so each one
+        replaces, and frees, the previous step's; objects created by the
+        measurement itself then cancel out of ``alloc_blocks``.
+        """
+        marks = self._marks
+        marks[0] = sys.getallocatedblocks()
+        marks[1] = sum(inst.cycles for inst in self._instances)
+        marks[2] = time.perf_counter_ns()
+        for i, inst in enumerate(self._instances):
+            inst.set_buttons(int(actions[i]))
+            inst.tick(frames, render)
+        marks[3] = time.perf_counter_ns()
+        if render:
+            for i, inst in enumerate(self._instances):
+                inst.read_frame(self._frames[i])
+        marks[4] = time.perf_counter_ns()
+        window = self.ram_window
+        if window is not None:
+            for i, inst in enumerate(self._instances):
+                inst.read_memory(*window, self._ram[i])
+        marks[5] = time.perf_counter_ns()
+        blocks = sys.getallocatedblocks() - marks[0]
+        self._rendered = render
+
+        profiler.add_time("emulate", marks[3] - marks[2])
+        profiler.add_time("render", marks[4] - marks[3])
+        profiler.add_time("observe", marks[5] - marks[4])
+        profiler.count_step(
+            frames * self.num_instances,
+            sum(inst.cycles for inst in self._instances) - marks[1],
+            blocks,
+        )
+        return self.observe()
+
+    def observe(self) -> Observation:
+        """Return the buffers filled by the last ``step``."""
+        return self._observation if self._rendered else self._ram_observation
+
+    def snapshot(self, instances: np.ndarray | None = None) -> Snapshot:
+        """Capture the state of ``instances`` (default: all) in memory.
+
+        Entry ``j`` of the result holds instance ``instances[j]``.
+        """
+        if instances is None:
+            instances = np.arange(self.num_instances)
+        states = []
+        for i in instances:
+            buf = io.BytesIO()
+            self._instances[i].save_state(buf)
+            states.append(buf.getvalue())
+        return Snapshot.from_states(states, self.rom_digest)
+
+    def restore(
+        self,
+        snapshot: Snapshot,
+        entries: np.ndarray | None = None,
+        instances: np.ndarray | None = None,
+    ) -> Observation:
+        """Load snapshot entries into instances and refresh the RAM observation.
+
+        Instance ``instances[k]`` gets entry ``entries[k]``. ``instances``
+        defaults to all of them; ``entries`` defaults to the matching index,
+        or to entry 0 for every instance when the snapshot holds a single
+        state, so branching N instances from one checkpoint is
+        ``restore(Snapshot.open(path))``. Frames are not re-rendered; the
+        next rendered ``step`` produces them.
+        """
+        if snapshot.rom_digest != self.rom_digest:
+            raise ValueError("snapshot was taken from a different ROM")
+        if instances is None:
+            instances = np.arange(self.num_instances)
+        if entries is None:
+            entries = np.zeros_like(instances) if len(snapshot) == 1 else instances
+        if len(entries) != len(instances):
+            raise ValueError("entries and instances must have the same length")
+        window = self.ram_window
+        for i, entry in zip(instances, entries):
+            inst = self._instances[i]
+            # BytesIO is the fastest reader the backend's byte-wise loader
+            # accepts; it copies just this entry out of the mapping.
+            state = io.BytesIO(snapshot.state(entry))
+            inst.load_state(state, snapshot.version)
+            if window is not None:
+                inst.read_memory(*window, self._ram[i])
+        self._rendered = False
+        return self._ram_observation
+
+    def close(self) -> None:
+        for inst in self._instances:
+            inst.close()
+        self._instances.clear()
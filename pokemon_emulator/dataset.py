@@ -0,0 +1,297 @@
+"""Streaming trajectory storage for offline datasets.
+
+``TrajectoryWriter`` appends ``(observation, action, reward, done)`` records
+into fixed-size chunks and hands full chunks to a background thread that
+writes them out, so rollout workers only pay for a memory copy. Each chunk is
+a directory holding one ``.npy`` file per field, either raw (and therefore
+memory-mappable) or zlib-compressed as ``.npy.z``::
+
+    <root>/chunk-000000/meta.json
+    <root>/chunk-000000/obs.frames.npy
+    <root>/chunk-000000/action.npy
+    ...
+
+Chunks appear atomically: they are written under a temporary name and renamed
+once complete. A writer opened on an existing root discards temporary
+directories left by an interrupted run and numbers new chunks after the
+highest existing one. ``TrajectoryReader`` iterates minibatches one chunk at a time,
+mapping raw chunks and decompressing compressed ones field by field, so a
+dataset never has to fit in memory.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import queue
+import shutil
+import threading
+import zlib
+from collections.abc import Iterator, Mapping
+
+import numpy as np
+
+_CHUNK_PREFIX = "chunk-"
+_COMPRESSIONS = (None, "zlib")
+
+
+def _flatten(
+    obs: np.ndarray | Mapping[str, np.ndarray],
+    action: np.ndarray,
+    reward: np.ndarray,
+    done: np.ndarray,
+) -> dict[str, np.ndarray]:
+    if isinstance(obs, Mapping):
+        fields = {f"obs.{name}": np.asarray(value) for name, value in obs.items()}
+    else:
+        fields = {"obs": np.asarray(obs)}
+    fields["action"] = np.asarray(action)
+    fields["reward"] = np.asarray(reward, dtype=np.float32)
+    fields["done"] = np.asarray(done, dtype=np.bool_)
+    return fields
+
+
+class TrajectoryWriter:
+    """Append records to chunked files under ``root`` from a background thread.
+
+    Args:
+        root: Dataset directory; created if missing. Existing chunks are kept
+            and numbering continues after them.
+        chunk_size: Records per chunk.
+        compression: ``None`` for memory-mappable chunks or ``"zlib"``.
+        max_pending: Full chunks allowed to queue for the writer thread before
+            ``append`` blocks.
+    """
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        chunk_size: int = 4096,
+        compression: str | None = None,
+        max_pending: int = 4,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        if compression not in _COMPRESSIONS:
+            raise ValueError(f"compression must be one of {_COMPRESSIONS}")
+        self.root = os.fspath(root)
+        self.chunk_size = chunk_size
+        self.compression = compression
+        os.makedirs(self.root, exist_ok=True)
+        for entry in os.listdir(self.root):
+            if entry.startswith(f".{_CHUNK_PREFIX}") and entry.endswith(".tmp"):
+                shutil.rmtree(os.path.join(self.root, entry))
+        existing = [_chunk_number(path) for path in _list_chunks(self.root)]
+        self._next_chunk = max(existing, default=-1) + 1
+        self._buffers: dict[str, np.ndarray] | None = None
+        self._filled = 0
+        self._error: BaseException | None = None
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(
+            target=self._run, name="TrajectoryWriter", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> TrajectoryWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def append(
+        self,
+        obs: np.ndarray | Mapping[str, np.ndarray],
+        action: np.ndarray,
+        reward: np.ndarray,
+        done: np.ndarray,
+    ) -> None:
+        """Append a batch of records; every argument has a leading record axis.
+
+        ``obs`` is a single array or a mapping of named arrays, e.g. the
+        ``frames`` and ``ram`` of an ``Observation`` or decoded game state.
+        Rewards are stored as float32 and done flags as bool.
+        """
+        self._raise_pending()
+        fields = _flatten(obs, action, reward, done)
+        sizes = {len(value) for value in fields.values()}
+        if len(sizes) != 1:
+            raise ValueError("all fields must have the same number of records")
+        (count,) = sizes
+        if self._buffers is None:
+            self._schema = {
+                name: (value.shape[1:], value.dtype) for name, value in fields.items()
+            }
+            self._buffers = self._allocate()
+        elif fields.keys() != self._schema.keys():
+            raise ValueError(
+                f"fields changed from {sorted(self._schema)} to {sorted(fields)}"
+            )
+
+        done_records = 0
+        while done_records < count:
+            take = min(count - done_records, self.chunk_size - self._filled)
+            for name, value in fields.items():
+                self._buffers[name][self._filled : self._filled + take] = value[
+                    done_records : done_records + take
+                ]
+            self._filled += take
+            done_records += take
+            if self._filled == self.chunk_size:
+                self._submit()
+
+    def flush(self) -> None:
+        """Submit the partial chunk and wait until everything is on disk."""
+        if self._filled:
+            self._submit()
+        self._queue.join()
+        self._raise_pending()
+
+    def close(self) -> None:
+        """Flush and stop the writer thread. Idempotent."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+
+    def _allocate(self) -> dict[str, np.ndarray]:
+        return {
+            name: np.empty((self.chunk_size, *shape), dtype=dtype)
+            for name, (shape, dtype) in self._schema.items()
+        }
+
+    def _submit(self) -> None:
+        chunk = {name: buf[: self._filled] for name, buf in self._buffers.items()}
+        self._queue.put((self._next_chunk, chunk))
+        self._next_chunk += 1
+        self._buffers = self._allocate()
+        self._filled = 0
+
+    def _raise_pending(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("trajectory writer thread failed") from error
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            try:
+                if self._error is None:
+                    self._write_chunk(*item)
+            except BaseException as exc:
+                self._error = exc
+            finally:
+                self._queue.task_done()
+        self._queue.task_done()
+
+    def _write_chunk(self, number: int, chunk: dict[str, np.ndarray]) -> None:
+        name = f"{_CHUNK_PREFIX}{number:06d}"
+        tmp = os.path.join(self.root, f".{name}.tmp")
+        os.makedirs(tmp)
+        for field, value in chunk.items():
+            if self.compression is None:
+                np.save(os.path.join(tmp, f"{field}.npy"), value)
+            else:
+                raw = io.BytesIO()
+                np.save(raw, value)
+                with open(os.path.join(tmp, f"{field}.npy.z"), "wb") as f:
+                    f.write(zlib.compress(raw.getbuffer(), 1))
+        records = len(next(iter(chunk.values())))
+        meta = {"records": records, "compression": self.compression}
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        os.rename(tmp, os.path.join(self.root, name))
+
+
+def _list_chunks(root: str) -> list[str]:
+    return sorted(
+        os.path.join(root, entry)
+        for entry in os.listdir(root)
+        if entry.startswith(_CHUNK_PREFIX)
+    )
+
+
+def _chunk_number(path: str) -> int:
+    return int(os.path.basename(path)[len(_CHUNK_PREFIX) :])
+
+
+class TrajectoryReader:
+    """Iterate a dataset written by ``TrajectoryWriter`` in minibatches."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = os.fspath(root)
+        self.chunks = _list_chunks(self.root)
+        self._meta = []
+        for chunk in self.chunks:
+            with open(os.path.join(chunk, "meta.json")) as f:
+                self._meta.append(json.load(f))
+
+    def __len__(self) -> int:
+        return sum(meta["records"] for meta in self._meta)
+
+    def load_chunk(self, index: int) -> dict[str, np.ndarray]:
+        """Fields of chunk ``index``; raw chunks come back memory-mapped."""
+        path = self.chunks[index]
+        fields = {}
+        for entry in sorted(os.listdir(path)):
+            full = os.path.join(path, entry)
+            if entry.endswith(".npy"):
+                fields[entry[: -len(".npy")]] = np.load(full, mmap_mode="r")
+            elif entry.endswith(".npy.z"):
+                with open(full, "rb") as f:
+                    raw = zlib.decompress(f.read())
+                fields[entry[: -len(".npy.z")]] = np.load(io.BytesIO(raw))
+        return fields
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        *,
+        shuffle: bool = False,
+        seed: int | None = None,
+        drop_last: bool = False,
+    ) -> Iterator[dict[str, np.ndarray]]:
+        """Yield dicts of ``batch_size`` records, one chunk in memory at a time.
+
+        With ``shuffle`` the chunk order and the records within each chunk are
+        permuted; batches may then mix the tail of one chunk with the head of
+        the next.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        rng = np.random.default_rng(seed)
+        order = np.arange(len(self.chunks))
+        if shuffle:
+            rng.shuffle(order)
+
+        carry: dict[str, np.ndarray] | None = None
+        for index in order:
+            chunk = self.load_chunk(index)
+            records = self._meta[index]["records"]
+            rows = rng.permutation(records) if shuffle else np.arange(records)
+            start = 0
+            if carry is not None:
+                need = batch_size - len(next(iter(carry.values())))
+                take = rows[:need]
+                carry = {
+                    name: np.concatenate([carry[name], value[take]])
+                    for name, value in chunk.items()
+                }
+                start = len(take)
+                if len(next(iter(carry.values()))) < batch_size:
+                    continue
+                yield carry
+                carry = None
+            while start + batch_size <= records:
+                take = rows[start : start + batch_size]
+                start += batch_size
+                if not shuffle:
+                    take = slice(take[0], take[-1] + 1)
+                yield {name: np.asarray(value[take]) for name, value in chunk.items()}
+            if start < records:
+                take = rows[start:]
+                carry = {name: np.asarray(value[take]) for name, value in chunk.items()}
+        if carry is not None and not drop_last:
+            yield carry
@@ -0,0 +1,273 @@
+"""Deterministic replay logs with keyframes and a seek index.
+
+A replay records one instance of a ``BatchedEmulator``: one packed
+``Buttons`` byte per emulated frame plus a keyframe snapshot every
+``keyframe_interval`` frames. The file is laid out as::
+
+    header    magic "PKEREPLY" | version u16 | flags u16 | rom sha1 [20]
+              | keyframe interval u32
+    keyframes single-entry ``Snapshot`` containers, back to back
+    inputs    frame_count bytes, one packed button mask per frame
+    index     keyframe_count x (frame u64, offset u64, length u64)
+    footer    inputs offset u64 | frame_count u64 | index offset u64
+              | keyframe_count u32 | magic "PKEREPLY"
+
+Keyframes are streamed to disk while recording; the inputs, index and footer
+are written on ``close``. ``ReplayPlayer.seek`` restores the nearest keyframe
+at or before the target and replays at most ``keyframe_interval`` frames of
+logged input, so seeking costs the same anywhere in a multi-hour log. The
+backend is deterministic, so a replay reproduces the recorded run bit for bit.
+"""
+
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .core import BatchedEmulator, Observation
+from .snapshot import Snapshot
+
+FORMAT_VERSION = 1
+_SUPPORTED_VERSIONS = frozenset({1})
+
+_MAGIC = b"PKEREPLY"
+_HEADER = struct.Struct("<8sHH20sI")
+_INDEX_ENTRY = struct.Struct("<QQQ")
+_FOOTER = struct.Struct("<QQQI8s")
+
+
+class ReplayFormatError(ValueError):
+    """The data is not a replay this release can read."""
+
+
+class ReplayRecorder:
+    """Record instance ``instance`` of ``emulator`` to ``path``.
+
+    Call ``record`` with the action given to that instance after every
+    ``emulator.step``; the recorder expands it to the frames the step ran. The
+    state at construction time is keyframe 0.
+
+    Args:
+        path: Output file.
+        emulator: Emulator to record from.
+        instance: Index of the recorded instance.
+        keyframe_interval: Frames between keyframes; bounds seek cost.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        emulator: BatchedEmulator,
+        instance: int = 0,
+        keyframe_interval: int = 3600,
+    ) -> None:
+        if keyframe_interval < 1:
+            raise ValueError(
+                f"keyframe_interval must be positive, got {keyframe_interval}"
+            )
+        self.emulator = emulator
+        self.instance = instance
+        self.keyframe_interval = keyframe_interval
+        self.frame_count = 0
+        self._inputs = bytearray()
+        self._index: list[tuple[int, int, int]] = []
+        self._file = open(path, "wb")
+        self._file.write(
+            _HEADER.pack(
+                _MAGIC, FORMAT_VERSION, 0, emulator.rom_digest, keyframe_interval
+            )
+        )
+        self._keyframe()
+
+    def __enter__(self) -> ReplayRecorder:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _keyframe(self) -> None:
+        with self.emulator.snapshot([self.instance]) as snapshot:
+            offset = self._file.tell()
+            length = snapshot.write(self._file)
+        self._index.append((self.frame_count, offset, length))
+
+    def record(self, action: int, frames: int | None = None) -> None:
+        """Log ``action`` for the frames of the step that just ran.
+
+        Pass the same ``frames`` the step was given, if any; it defaults to
+        the emulator's ``frame_skip``.
+        """
+        if frames is None:
+            frames = self.emulator.frame_skip
+        elif frames < 1:
+            raise ValueError(f"frames must be positive, got {frames}")
+        self._inputs += bytes((int(action),)) * frames
+        self.frame_count += frames
+        if self.frame_count - self._index[-1][0] >= self.keyframe_interval:
+            self._keyframe()
+
+    def close(self) -> None:
+        """Write inputs, seek index and footer. Idempotent."""
+        if self._file.closed:
+            return
+        inputs_offset = self._file.tell()
+        self._file.write(self._inputs)
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(_INDEX_ENTRY.pack(*entry))
+        self._file.write(
+            _FOOTER.pack(
+                inputs_offset, self.frame_count, index_offset, len(self._index), _MAGIC
+            )
+        )
+        self._file.close()
+
+
+class Replay:
+    """A replay file mapped read-only.
+
+    Attributes:
+        inputs: ``(frame_count,)`` uint8 view of the logged button masks.
+        keyframe_frames: Frame number of each keyframe, ascending.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self) -> None:
+        view = memoryview(self._mmap)
+        self._view = view
+        if len(view) < _HEADER.size + _FOOTER.size:
+            raise ReplayFormatError("truncated replay")
+        magic, version, _flags, rom_digest, interval = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ReplayFormatError("not a replay (bad magic)")
+        if version not in _SUPPORTED_VERSIONS:
+            raise ReplayFormatError(
+                f"unsupported replay version {version} "
+                f"(this release reads {sorted(_SUPPORTED_VERSIONS)})"
+            )
+        inputs_offset, frame_count, index_offset, count, magic = _FOOTER.unpack_from(
+            view, len(view) - _FOOTER.size
+        )
+        if magic != _MAGIC:
+            raise ReplayFormatError("replay has no footer; was the recorder closed?")
+        if index_offset + count * _INDEX_ENTRY.size != len(view) - _FOOTER.size:
+            raise ReplayFormatError("corrupt replay index")
+
+        self.version = version
+        self.rom_digest = rom_digest
+        self.keyframe_interval = interval
+        self.frame_count = frame_count
+        self.inputs = np.frombuffer(
+            self._mmap, dtype=np.uint8, count=frame_count, offset=inputs_offset
+        )
+        entries = [
+            _INDEX_ENTRY.unpack_from(view, index_offset + i * _INDEX_ENTRY.size)
+            for i in range(count)
+        ]
+        self.keyframe_frames = [frame for frame, _, _ in entries]
+        self._keyframes = [(offset, length) for _, offset, length in entries]
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __enter__(self) -> Replay:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def keyframe(self, frame: int) -> tuple[int, Snapshot]:
+        """Nearest keyframe at or before ``frame`` and its frame number."""
+        if not 0 <= frame <= self.frame_count:
+            raise IndexError(f"frame {frame} outside replay of {self.frame_count}")
+        k = bisect.bisect_right(self.keyframe_frames, frame) - 1
+        offset, length = self._keyframes[k]
+        return self.keyframe_frames[k], Snapshot(self._view[offset : offset + length])
+
+    def close(self) -> None:
+        self.inputs = None
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        self._mmap.close()
+
+
+class ReplayPlayer:
+    """Play a ``Replay`` back on a private single-instance emulator.
+
+    Args:
+        replay: Replay to play.
+        rom_path: ROM the replay was recorded from.
+        ram_window: RAM range observed, as for ``BatchedEmulator``.
+    """
+
+    def __init__(
+        self,
+        replay: Replay,
+        rom_path: str | os.PathLike[str],
+        *,
+        ram_window: tuple[int, int] | None = None,
+    ) -> None:
+        self.replay = replay
+        self.emulator = BatchedEmulator(rom_path, 1, ram_window=ram_window)
+        if self.emulator.rom_digest != replay.rom_digest:
+            self.emulator.close()
+            raise ValueError("replay was recorded from a different ROM")
+        self.frame = 0
+        self.seek(0)
+
+    def __enter__(self) -> ReplayPlayer:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def seek(self, frame: int, render: bool = False) -> Observation:
+        """Jump to the state after ``frame`` logged frames.
+
+        With ``render``, the last frame is emulated from the previous
+        keyframe even when ``frame`` is a keyframe itself, so that it can be
+        rendered. Frame 0 has no frame to render and raises ``ValueError``.
+        """
+        if not 0 <= frame <= self.replay.frame_count:
+            raise IndexError(
+                f"frame {frame} outside replay of {self.replay.frame_count}"
+            )
+        if render and frame == 0:
+            raise ValueError("cannot render frame 0; seek to it without render")
+        start, snapshot = self.replay.keyframe(frame - 1 if render else frame)
+        with snapshot:
+            obs = self.emulator.restore(snapshot)
+        # Replay runs of identical input as single multi-frame steps,
+        # rendering only the last frame if asked.
+        inputs = self.replay.inputs[start:frame]
+        bounds = [0, *(np.flatnonzero(np.diff(inputs)) + 1).tolist(), len(inputs)]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if hi > lo:
+                obs = self.emulator.step(
+                    inputs[lo : lo + 1], render and hi == len(inputs), hi - lo
+                )
+        self.frame = frame
+        return obs
+
+    def step(self, render: bool = False) -> Observation:
+        """Advance one logged frame."""
+        if self.frame >= self.replay.frame_count:
+            raise EOFError("end of replay")
+        actions = self.replay.inputs[self.frame : self.frame + 1]
+        self.frame += 1
+        return self.emulator.step(actions, render)
+
+    def close(self) -> None:
+        self.emulator.close()
@@ -0,0 +1,231 @@
+"""ROM preprocessing cached on disk, keyed by ROM hash.
+
+``RomData`` gives access to everything derived from a ROM image: the parsed
+cartridge header, the bank layout and decoded game tables such as species
+names. Each table is computed the first time it is asked for, stored in
+``<cache dir>/<sha1>.json`` and, from then on, loaded from there instead of
+being re-derived. Nothing is read or decoded until it is used, so a new
+worker pays only for hashing the ROM.
+
+The cache directory is ``$POKEMON_EMULATOR_CACHE`` if set, otherwise
+``$XDG_CACHE_HOME/pokemon_emulator`` (``~/.cache/pokemon_emulator``). Entries
+written by a different ``CACHE_VERSION`` are ignored and rebuilt.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from functools import cached_property
+from typing import Any
+
+CACHE_VERSION = 1
+
+BANK_SIZE = 0x4000
+
+# Cartridge type byte (0x147) to memory bank controller.
+_MBC_TYPES = {
+    0x00: "ROM",
+    0x01: "MBC1",
+    0x02: "MBC1",
+    0x03: "MBC1",
+    0x05: "MBC2",
+    0x06: "MBC2",
+    0x0F: "MBC3",
+    0x10: "MBC3",
+    0x11: "MBC3",
+    0x12: "MBC3",
+    0x13: "MBC3",
+    0x19: "MBC5",
+    0x1A: "MBC5",
+    0x1B: "MBC5",
+    0x1C: "MBC5",
+    0x1D: "MBC5",
+    0x1E: "MBC5",
+}
+# RAM size byte (0x149) to 8 KiB banks.
+_RAM_BANKS = {0x00: 0, 0x01: 0, 0x02: 1, 0x03: 4, 0x04: 16, 0x05: 8}
+
+# Generation I text encoding; 0x50 terminates a string.
+_TERMINATOR = 0x50
+_CHARSET = {
+    0x7F: " ",
+    0x9A: "(",
+    0x9B: ")",
+    0x9C: ":",
+    0x9D: ";",
+    0x9E: "[",
+    0x9F: "]",
+    0xBA: "é",
+    0xE0: "'",
+    0xE3: "-",
+    0xE6: "?",
+    0xE7: "!",
+    0xE8: ".",
+    0xEF: "♂",
+    0xF4: ",",
+    0xF5: "♀",
+    **{0x80 + i: chr(ord("A") + i) for i in range(26)},
+    **{0xA0 + i: chr(ord("a") + i) for i in range(26)},
+    **{0xF6 + i: str(i) for i in range(10)},
+}
+
+# MonsterNames (07:421E in pokered): 190 fixed-width names in internal order.
+_SPECIES_NAMES = {"POKEMON RED": 0x1C21E, "POKEMON BLUE": 0x1C21E}
+_SPECIES_COUNT = 190
+_SPECIES_NAME_LENGTH = 10
+
+
+def cache_dir() -> str:
+    """Directory holding cached ROM tables."""
+    if path := os.environ.get("POKEMON_EMULATOR_CACHE"):
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "pokemon_emulator")
+
+
+def decode_text(raw: bytes) -> str:
+    """Decode a Generation I string up to its terminator."""
+    chars = []
+    for byte in raw:
+        if byte == _TERMINATOR:
+            break
+        chars.append(_CHARSET.get(byte, "?"))
+    return "".join(chars)
+
+
+def _decode_header(rom: bytes) -> dict[str, Any]:
+    if len(rom) < 0x150:
+        raise ValueError("ROM is too small to hold a cartridge header")
+    checksum = 0
+    for byte in rom[0x134:0x14D]:
+        checksum = (checksum - byte - 1) & 0xFF
+    return {
+        "title": rom[0x134:0x144].split(b"\0", 1)[0].decode("ascii", "replace").strip(),
+        "cgb": rom[0x143] in (0x80, 0xC0),
+        "cartridge_type": rom[0x147],
+        "mbc": _MBC_TYPES.get(rom[0x147], f"0x{rom[0x147]:02X}"),
+        "rom_banks": 2 << rom[0x148] if rom[0x148] <= 8 else len(rom) // BANK_SIZE,
+        "ram_banks": _RAM_BANKS.get(rom[0x149], 0),
+        "header_checksum_ok": checksum == rom[0x14D],
+    }
+
+
+def _decode_banks(rom: bytes) -> list[dict[str, int]]:
+    """Per 16 KiB bank: file offset and length of trailing fill bytes."""
+    banks = []
+    for offset in range(0, len(rom), BANK_SIZE):
+        bank = rom[offset : offset + BANK_SIZE]
+        fill = bank[-1:]
+        used = len(bank.rstrip(fill)) if fill in (b"\0", b"\xff") else len(bank)
+        banks.append({"offset": offset, "free": len(bank) - used})
+    return banks
+
+
+def _decode_species_names(rom: bytes) -> list[str]:
+    title = _decode_header(rom)["title"]
+    try:
+        start = _SPECIES_NAMES[title]
+    except KeyError:
+        raise ValueError(f"no species name table known for {title!r}") from None
+    return [
+        decode_text(rom[offset : offset + _SPECIES_NAME_LENGTH])
+        for offset in range(
+            start, start + _SPECIES_COUNT * _SPECIES_NAME_LENGTH, _SPECIES_NAME_LENGTH
+        )
+    ]
+
+
+_TABLES: dict[str, Callable[[bytes], Any]] = {
+    "header": _decode_header,
+    "banks": _decode_banks,
+    "species_names": _decode_species_names,
+}
+
+
+class RomData:
+    """Lazily decoded, disk-cached facts about one ROM image.
+
+    Args:
+        rom_path: ROM file.
+        cache: Cache directory; ``None`` uses ``cache_dir()``. Pass ``False``
+            to decode in memory only.
+    """
+
+    def __init__(
+        self,
+        rom_path: str | os.PathLike[str],
+        cache: str | os.PathLike[str] | bool | None = None,
+    ) -> None:
+        self.rom_path = os.fspath(rom_path)
+        with open(self.rom_path, "rb") as f:
+            self.rom = f.read()
+        self.digest = hashlib.sha1(self.rom).digest()
+        if cache is False:
+            self._cache_path = None
+        else:
+            root = cache_dir() if cache in (None, True) else os.fspath(cache)
+            self._cache_path = os.path.join(root, f"{self.digest.hex()}.json")
+        self._tables: dict[str, Any] | None = None
+
+    def table(self, name: str) -> Any:
+        """Decoded table ``name``, from the cache if present."""
+        if self._tables is None:
+            self._tables = self._load()
+        if name not in self._tables:
+            try:
+                decode = _TABLES[name]
+            except KeyError:
+                raise KeyError(f"unknown ROM table {name!r}") from None
+            self._tables[name] = decode(self.rom)
+            self._store()
+        return self._tables[name]
+
+    @cached_property
+    def header(self) -> dict[str, Any]:
+        """Title, CGB flag, cartridge/MBC type, ROM and RAM bank counts."""
+        return self.table("header")
+
+    @cached_property
+    def banks(self) -> list[dict[str, int]]:
+        """Bank layout: offset and trailing free space of each 16 KiB bank."""
+        return self.table("banks")
+
+    @cached_property
+    def species_names(self) -> list[str]:
+        """Species names by internal index (index 0 is species 1)."""
+        return self.table("species_names")
+
+    def _load(self) -> dict[str, Any]:
+        if self._cache_path is None:
+            return {}
+        return self._read_cache()
+
+    def _read_cache(self) -> dict[str, Any]:
+        try:
+            with open(self._cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("tables", {})
+
+    def _store(self) -> None:
+        if self._cache_path is None:
+            return
+        # Merge with what other processes stored since we loaded.
+        tables = {**self._read_cache(), **self._tables}
+        tmp = f"{self._cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"version": CACHE_VERSION, "tables": tables}, f)
+            os.replace(tmp, self._cache_path)
+        except OSError:
+            # A read-only or full cache only costs speed, never correctness.
+            pass
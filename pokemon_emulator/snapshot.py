@@ -0,0 +1,135 @@
+"""Versioned save-state snapshots that restore from a read-only mapping.
+
+A snapshot file is a small header, an entry table and the raw backend state
+blobs laid out back to back::
+
+    header  magic "PKESNAP\\0" | version u16 | flags u16 | rom sha1 [20] | count u32
+    table   count x (offset u64, length u64)
+    blobs   backend save states
+
+Version history:
+
+1. Each blob is a bare PyBoy save state.
+2. Each blob is a PyBoy save state followed by one byte holding the packed
+   button mask the instance was holding.
+
+``Snapshot.open`` maps the file read-only and only parses the header and
+table. ``Snapshot.state`` returns a zero-copy view of one entry; restoring it
+copies just that entry into an in-memory stream for the backend, whose loader
+reads byte by byte. Any number of instances and processes can branch from the
+same file while sharing its pages through the OS page cache.
+
+``FORMAT_VERSION`` is bumped whenever the container layout or the blob
+contents change; ``Snapshot.version`` tells the loader which to expect. Readers
+for older versions are kept so snapshots written by earlier releases stay
+loadable.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import BinaryIO
+
+FORMAT_VERSION = 2
+_SUPPORTED_VERSIONS = frozenset({1, 2})
+
+_MAGIC = b"PKESNAP\0"
+_HEADER = struct.Struct("<8sHH20sI")
+_ENTRY = struct.Struct("<QQ")
+
+
+class SnapshotFormatError(ValueError):
+    """The data is not a snapshot this release can read."""
+
+
+class Snapshot:
+    """A read-only collection of per-instance save states.
+
+    Build one with ``BatchedEmulator.snapshot`` or ``Snapshot.open``; the
+    constructor is for wrapping a buffer that already holds a snapshot.
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> None:
+        self._mmap = buffer if isinstance(buffer, mmap.mmap) else None
+        self._view = memoryview(buffer)
+        if len(self._view) < _HEADER.size:
+            raise SnapshotFormatError("truncated snapshot header")
+        magic, version, _flags, rom_digest, count = _HEADER.unpack_from(self._view)
+        if magic != _MAGIC:
+            raise SnapshotFormatError("not a snapshot (bad magic)")
+        if version not in _SUPPORTED_VERSIONS:
+            raise SnapshotFormatError(
+                f"unsupported snapshot version {version} "
+                f"(this release reads {sorted(_SUPPORTED_VERSIONS)})"
+            )
+        table_end = _HEADER.size + count * _ENTRY.size
+        if len(self._view) < table_end:
+            raise SnapshotFormatError("truncated snapshot entry table")
+        entries = [
+            _ENTRY.unpack_from(self._view, _HEADER.size + i * _ENTRY.size)
+            for i in range(count)
+        ]
+        for offset, length in entries:
+            if offset < table_end or offset + length > len(self._view):
+                raise SnapshotFormatError("snapshot entry out of bounds")
+        self.version = version
+        self.rom_digest = rom_digest
+        self._entries = entries
+
+    @classmethod
+    def from_states(cls, states: Sequence[bytes], rom_digest: bytes) -> Snapshot:
+        """Pack backend save states into an in-memory snapshot."""
+        if len(rom_digest) != 20:
+            raise ValueError("rom_digest must be a 20-byte SHA-1 digest")
+        offset = _HEADER.size + len(states) * _ENTRY.size
+        parts = [_HEADER.pack(_MAGIC, FORMAT_VERSION, 0, rom_digest, len(states))]
+        for state in states:
+            parts.append(_ENTRY.pack(offset, len(state)))
+            offset += len(state)
+        parts.extend(states)
+        return cls(b"".join(parts))
+
+    @classmethod
+    def open(cls, path: str | os.PathLike[str]) -> Snapshot:
+        """Map a snapshot file without reading its states."""
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapping)
+        except Exception:
+            mapping.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def state(self, index: int) -> memoryview:
+        """Zero-copy view of entry ``index``'s backend state."""
+        offset, length = self._entries[index]
+        return self._view[offset : offset + length]
+
+    def write(self, f: BinaryIO) -> int:
+        """Write the snapshot to an open binary file; returns its size."""
+        return f.write(self._view)
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Write the snapshot to ``path`` atomically."""
+        tmp = f"{os.fspath(path)}.tmp"
+        with open(tmp, "wb") as f:
+            self.write(f)
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        """Release the mapping. Views from ``state`` must not be used after."""
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
@@ -0,0 +1,354 @@
+"""Process-pool vectorized emulator backed by shared-memory ring buffers.
+
+``VectorEmulator`` shards instances across worker processes, each running its
+own ``BatchedEmulator``. Actions and observations live in
+``multiprocessing.shared_memory`` blocks shaped ``(ring_size, N, ...)``; the
+pipes to the workers only ever carry a ring slot number, so nothing large is
+pickled.
+
+Two stepping modes are available:
+
+``"sync"``
+    ``step(actions)`` advances every instance and returns views of the ring
+    slot it wrote. A view stays valid for ``ring_size - 1`` further steps.
+
+``"async"``
+    ``send(actions, instance_ids)`` dispatches work to the shards owning those
+    instances and ``recv()`` returns as soon as ``batch_workers`` shards have
+    finished, first-ready first. Slow shards never hold up fast ones.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import traceback
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from ._backend import SCREEN_HEIGHT, SCREEN_WIDTH
+from .core import BatchedEmulator, Observation
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Shapes and shared-memory names of the ring buffers."""
+
+    ring_size: int
+    num_instances: int
+    ram_size: int
+    actions: str
+    frames: str
+    ram: str
+
+    def views(self) -> tuple[list[SharedMemory], np.ndarray, np.ndarray, np.ndarray]:
+        blocks = [SharedMemory(name) for name in (self.actions, self.frames, self.ram)]
+        return (blocks, *self._arrays(blocks))
+
+    def _arrays(self, blocks: list[SharedMemory]) -> tuple[np.ndarray, ...]:
+        n, r = self.num_instances, self.ring_size
+        shapes = (
+            (r, n),
+            (r, n, SCREEN_HEIGHT, SCREEN_WIDTH, 3),
+            (r, n, self.ram_size),
+        )
+        return tuple(
+            np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+            for shape, block in zip(shapes, blocks)
+        )
+
+
+def _worker(
+    conn: Connection,
+    rom_path: str,
+    lo: int,
+    hi: int,
+    ram_window: tuple[int, int] | None,
+    frame_skip: int,
+    layout: _Layout,
+) -> None:
+    blocks, actions, frames, ram = layout.views()
+    try:
+        emu = BatchedEmulator(
+            rom_path, hi - lo, ram_window=ram_window, frame_skip=frame_skip
+        )
+    except BaseException:
+        conn.send(traceback.format_exc())
+        raise
+    conn.send(None)
+    try:
+        while (message := conn.recv()) is not None:
+            slot, render = message
+            try:
+                obs = emu.step(actions[slot, lo:hi], render)
+                if render:
+                    frames[slot, lo:hi] = obs.frames
+                ram[slot, lo:hi] = obs.ram
+            except Exception:
+                conn.send(traceback.format_exc())
+            else:
+                conn.send(slot)
+    finally:
+        emu.close()
+        del actions, frames, ram
+        for block in blocks:
+            block.close()
+
+
+class VectorEmulator:
+    """``num_instances`` instances sharded over ``num_workers`` processes.
+
+    Args:
+        rom_path: Game Boy ROM to load into every instance.
+        num_instances: Total number of instances.
+        num_workers: Worker processes; defaults to ``os.cpu_count()`` capped
+            at ``num_instances``. Instances are split into contiguous shards.
+        mode: ``"sync"`` or ``"async"``, see the module docstring.
+        batch_workers: In async mode, how many finished shards ``recv`` waits
+            for. Defaults to one.
+        ring_size: Observation slots kept per instance.
+        ram_window: ``(start, stop)`` RAM range observed, or ``None`` for
+            none, as for ``BatchedEmulator``.
+        frame_skip: Frames emulated per step, as for ``BatchedEmulator``.
+        render: Whether steps produce frames unless told otherwise.
+        start_method: ``multiprocessing`` start method; platform default if
+            omitted.
+    """
+
+    def __init__(
+        self,
+        rom_path: str | os.PathLike[str],
+        num_instances: int,
+        num_workers: int | None = None,
+        *,
+        mode: str = "sync",
+        batch_workers: int = 1,
+        ring_size: int = 2,
+        ram_window: tuple[int, int] | None = None,
+        frame_skip: int = 1,
+        render: bool = True,
+        start_method: str | None = None,
+    ) -> None:
+        if mode not in ("sync", "async"):
+            raise ValueError(f"mode must be 'sync' or 'async', got {mode!r}")
+        if num_instances < 1:
+            raise ValueError(f"num_instances must be positive, got {num_instances}")
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = min(num_workers, num_instances)
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be positive, got {num_workers}")
+        if not 1 <= batch_workers <= num_workers:
+            raise ValueError(f"batch_workers must be in [1, {num_workers}]")
+        if ring_size < 1:
+            raise ValueError(f"ring_size must be positive, got {ring_size}")
+
+        self.num_instances = num_instances
+        self.num_workers = num_workers
+        self.mode = mode
+        self.batch_workers = batch_workers
+        self.ring_size = ring_size
+        self.render = render
+
+        bounds = np.linspace(0, num_instances, num_workers + 1).astype(int)
+        self._shards = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self._shard_of = np.repeat(np.arange(num_workers), np.diff(bounds))
+
+        self._slots = [0] * num_workers
+        self._busy = [False] * num_workers
+        self._rendered = [False] * num_workers
+        self._step = 0
+        self._blocks: list[SharedMemory] = []
+        self._conns: list[Connection] = []
+        self._procs = []
+        self._actions = self._frames = self._ram = None
+        try:
+            self._start(rom_path, ram_window, frame_skip, start_method)
+        except BaseException:
+            self.close()
+            raise
+
+    def _start(
+        self,
+        rom_path: str | os.PathLike[str],
+        ram_window: tuple[int, int] | None,
+        frame_skip: int,
+        start_method: str | None,
+    ) -> None:
+        ram_size = 0 if ram_window is None else ram_window[1] - ram_window[0]
+        frame_size = SCREEN_HEIGHT * SCREEN_WIDTH * 3
+        for item in (1, frame_size, ram_size):
+            # SharedMemory refuses empty blocks; an unused RAM ring gets one byte.
+            size = max(self.ring_size * self.num_instances * item, 1)
+            self._blocks.append(SharedMemory(create=True, size=size))
+        layout = _Layout(
+            self.ring_size,
+            self.num_instances,
+            ram_size,
+            *(b.name for b in self._blocks),
+        )
+        self._actions, self._frames, self._ram = layout._arrays(self._blocks)
+
+        ctx = mp.get_context(start_method)
+        for lo, hi in self._shards:
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=_worker,
+                args=(
+                    child,
+                    os.fspath(rom_path),
+                    lo,
+                    hi,
+                    ram_window,
+                    frame_skip,
+                    layout,
+                ),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._check([conn.recv() for conn in self._conns])
+
+    def __enter__(self) -> VectorEmulator:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_instances
+
+    @staticmethod
+    def _check(replies: list[object]) -> None:
+        """Raise for the first failed worker among already-read replies.
+
+        Callers read every outstanding reply before checking, so a failure
+        never leaves another worker's reply in its pipe to be mistaken for
+        the answer to the next request.
+        """
+        for reply in replies:
+            if isinstance(reply, str):
+                raise RuntimeError(f"emulator worker failed:\n{reply}")
+
+    def step(self, actions: np.ndarray, render: bool | None = None) -> Observation:
+        """Advance every instance one step (sync mode).
+
+        ``render`` overrides the constructor default for this step.
+        """
+        if self.mode != "sync":
+            raise RuntimeError("step() is only available in sync mode; use send/recv")
+        actions = np.asarray(actions, dtype=np.uint8)
+        if actions.shape != (self.num_instances,):
+            raise ValueError(
+                f"expected actions of shape ({self.num_instances},), got {actions.shape}"
+            )
+        if render is None:
+            render = self.render
+        slot = self._step % self.ring_size
+        self._step += 1
+        self._actions[slot] = actions
+        for conn in self._conns:
+            conn.send((slot, render))
+        self._check([conn.recv() for conn in self._conns])
+        return Observation(self._frames[slot] if render else None, self._ram[slot])
+
+    def send(
+        self,
+        actions: np.ndarray,
+        instance_ids: np.ndarray,
+        render: bool | None = None,
+    ) -> None:
+        """Dispatch ``actions[k]`` to instance ``instance_ids[k]`` (async mode).
+
+        ``instance_ids`` must cover whole shards that are not already running,
+        as returned by ``recv``; pass ``np.arange(N)`` to start every shard.
+        ``render`` overrides the constructor default for this dispatch.
+        """
+        if self.mode != "async":
+            raise RuntimeError("send() is only available in async mode; use step")
+        if render is None:
+            render = self.render
+        actions = np.asarray(actions, dtype=np.uint8)
+        instance_ids = np.asarray(instance_ids)
+        if actions.shape != instance_ids.shape or instance_ids.ndim != 1:
+            raise ValueError("actions and instance_ids must be 1-D, same shape")
+        if len(instance_ids) and not (
+            0 <= instance_ids.min() and instance_ids.max() < self.num_instances
+        ):
+            raise ValueError(f"instance_ids must be in [0, {self.num_instances})")
+        if len(np.unique(instance_ids)) != len(instance_ids):
+            raise ValueError("instance_ids must not repeat")
+        workers = np.unique(self._shard_of[instance_ids])
+        expected = sum(self._shards[w][1] - self._shards[w][0] for w in workers)
+        if expected != len(instance_ids):
+            raise ValueError("instance_ids must cover whole shards")
+        if any(self._busy[w] for w in workers):
+            raise RuntimeError("a shard in instance_ids is still running")
+        for w in workers:
+            self._slots[w] = (self._slots[w] + 1) % self.ring_size
+        slots = np.asarray(self._slots)[self._shard_of[instance_ids]]
+        self._actions[slots, instance_ids] = actions
+        for w in workers:
+            self._busy[w] = True
+            self._rendered[w] = render
+            self._conns[w].send((self._slots[w], render))
+
+    def recv(self, timeout: float | None = None) -> tuple[np.ndarray, Observation]:
+        """Collect the first ``batch_workers`` shards to finish (async mode).
+
+        Returns the ids of the instances that stepped and a gathered copy of
+        their observations, in the same order. Frames are ``None`` unless
+        every returned shard was dispatched with rendering on. Fewer shards
+        are returned if fewer are running or ``timeout`` expires.
+        """
+        if self.mode != "async":
+            raise RuntimeError("recv() is only available in async mode; use step")
+        pending = {self._conns[w]: w for w in range(self.num_workers) if self._busy[w]}
+        done: list[int] = []
+        while pending and len(done) < self.batch_workers:
+            ready = wait(list(pending), timeout)
+            if not ready:
+                break
+            replies = []
+            for conn in ready:
+                w = pending.pop(conn)
+                self._busy[w] = False
+                replies.append(conn.recv())
+                done.append(w)
+            self._check(replies)
+        done.sort()
+        ids = np.concatenate(
+            [np.arange(*self._shards[w]) for w in done] or [np.empty(0, dtype=int)]
+        )
+        slots = np.asarray(self._slots, dtype=np.intp)[self._shard_of[ids]]
+        rendered = bool(done) and all(self._rendered[w] for w in done)
+        frames = self._frames[slots, ids] if rendered else None
+        return ids, Observation(frames, self._ram[slots, ids])
+
+    def close(self) -> None:
+        """Stop the workers and free shared memory.
+
+        Safe to call repeatedly, including after a failed construction.
+        """
+        for conn, proc in zip(self._conns, self._procs):
+            try:
+                if not conn.closed:
+                    conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+            conn.close()
+        self._conns.clear()
+        self._procs.clear()
+        self._actions = self._frames = self._ram = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [_ROOT, os.path.join(_ROOT, "benchmarks")]
+
+from testrom import write_test_rom  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def rom(tmp_path_factory):
+    return write_test_rom(tmp_path_factory.mktemp("rom") / "test.gb")
+
+
+@pytest.fixture(autouse=True)
+def _rom_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("POKEMON_EMULATOR_CACHE", str(tmp_path / "cache"))
@@ -0,0 +1,43 @@
+import json
+
+import numpy as np
+import pytest
+from suite import compare
+
+from pokemon_emulator import WRAM_START, WRAM_STOP, BatchedEmulator, Buttons
+
+
+@pytest.mark.parametrize("button", list(Buttons))
+def test_every_button_changes_test_rom_ram(rom, button):
+    with BatchedEmulator(rom, 2, ram_window=(WRAM_START, WRAM_STOP)) as emu:
+        emu.step(np.zeros(2, dtype=np.uint8), render=False, frames=100)
+        obs = emu.step(np.array([button, 0], dtype=np.uint8), render=False)
+        assert (obs.ram[0] != obs.ram[1]).any()
+
+
+def _run(quick=False, **values):
+    return {
+        "schema": 1,
+        "meta": {"quick": quick},
+        "results": {
+            name: {"value": value, "unit": "u", "higher_is_better": name == "fps"}
+            for name, value in values.items()
+        },
+    }
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = _run(fps=100.0, latency_ms=10.0)
+    assert compare(_run(fps=90.0, latency_ms=11.0), baseline, 0.2) == []
+    regressions = compare(_run(fps=70.0, latency_ms=13.0), baseline, 0.2)
+    assert [line.split(":")[0] for line in regressions] == ["fps", "latency_ms"]
+
+
+def test_compare_refuses_mismatched_runs():
+    baseline = _run(fps=100.0)
+    with pytest.raises(ValueError, match="quick"):
+        compare(_run(quick=True, fps=100.0), baseline, 0.2)
+    other = json.loads(json.dumps(baseline))
+    other["schema"] = 2
+    with pytest.raises(ValueError, match="schema"):
+        compare(_run(fps=100.0), other, 0.2)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pokemon_emulator import BatchedEmulator, Buttons, VectorEmulator
+
+
+def test_no_ram_observed_by_default(rom):
+    actions = np.zeros(2, dtype=np.uint8)
+    with BatchedEmulator(rom, 2, render=False) as emu:
+        assert emu.ram_window is None
+        assert emu.step(actions).ram.shape == (2, 0)
+        assert emu.restore(emu.snapshot()).ram.shape == (2, 0)
+    with VectorEmulator(rom, 2, 2, render=False) as env:
+        assert env.step(actions).ram.shape == (2, 0)
+
+
+def test_ram_window_matches_wider_window(rom):
+    rng = np.random.default_rng(0)
+    with BatchedEmulator(rom, 2, ram_window=(0xC000, 0xD100)) as wide, BatchedEmulator(
+        rom, 2, ram_window=(0xD000, 0xD002)
+    ) as narrow:
+        # Run past the boot ROM (about 60 frames) so RAM is not still blank.
+        for _ in range(80):
+            actions = rng.integers(0, 256, 2, dtype=np.uint8)
+            expected = wide.step(actions).ram[:, 0x1000:0x1002]
+            np.testing.assert_array_equal(narrow.step(actions).ram, expected)
+
+
+def test_frame_skip_and_frames_override(rom):
+    actions = np.zeros(2, dtype=np.uint8)
+    with BatchedEmulator(rom, 2, frame_skip=4, render=False) as emu:
+        before = emu.frame_counts
+        emu.step(actions)
+        np.testing.assert_array_equal(emu.frame_counts - before, [4, 4])
+        emu.step(actions, frames=7)
+        np.testing.assert_array_equal(emu.frame_counts - before, [11, 11])
+        with pytest.raises(ValueError):
+            emu.step(actions, frames=0)
+
+
+def test_frame_skip_matches_single_frames(rom):
+    actions = np.array([Buttons.A, Buttons.DOWN], dtype=np.uint8)
+    with BatchedEmulator(rom, 2, ram_window=(0xD000, 0xD002)) as one, BatchedEmulator(
+        rom, 2, ram_window=(0xD000, 0xD002), frame_skip=3
+    ) as skip:
+        for _ in range(30):
+            for _ in range(3):
+                expected = one.step(actions)
+            got = skip.step(actions)
+        np.testing.assert_array_equal(got.ram, expected.ram)
+        np.testing.assert_array_equal(got.frames, expected.frames)
+
+
+def test_render_on_demand(rom):
+    actions = np.zeros(2, dtype=np.uint8)
+    with BatchedEmulator(rom, 2, render=False) as emu:
+        assert emu.step(actions).frames is None
+        obs = emu.step(actions, render=True)
+        assert obs.frames.shape == (2, 144, 160, 3)
+        assert emu.observe().frames is not None
+        assert emu.step(actions).frames is None
+    with BatchedEmulator(rom, 2) as emu:
+        assert emu.step(actions).frames is not None
+        assert emu.step(actions, render=False).frames is None
+
+
+def test_vector_render_passthrough(rom):
+    actions = np.zeros(2, dtype=np.uint8)
+    with BatchedEmulator(rom, 2, frame_skip=80) as emu, VectorEmulator(
+        rom, 2, 2, frame_skip=80, render=False
+    ) as env:
+        assert env.step(actions).frames is None
+        emu.step(actions)
+        obs = env.step(actions, render=True)
+        np.testing.assert_array_equal(obs.frames, emu.step(actions).frames)
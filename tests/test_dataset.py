@@ -0,0 +1,80 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from pokemon_emulator import TrajectoryReader, TrajectoryWriter
+
+
+def _write(root, compression, records=250, batch=25, chunk_size=100):
+    with TrajectoryWriter(root, chunk_size=chunk_size, compression=compression) as w:
+        for start in range(0, records, batch):
+            ids = np.arange(start, start + batch)
+            obs = {"ram": (ids[:, None] + np.arange(8)).astype(np.uint8), "id": ids}
+            w.append(obs, ids % 256, ids / 2, ids % 7 == 0)
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_round_trip(tmp_path, compression):
+    _write(tmp_path, compression)
+    reader = TrajectoryReader(tmp_path)
+
+    assert len(reader) == 250
+    assert len(reader.chunks) == 3
+    assert len(reader.load_chunk(2)["action"]) == 50
+
+    batches = list(reader.iter_batches(64))
+    assert [len(b["action"]) for b in batches] == [64, 64, 64, 58]
+    ids = np.concatenate([b["obs.id"] for b in batches])
+    np.testing.assert_array_equal(ids, np.arange(250))
+    ram = np.concatenate([b["obs.ram"] for b in batches])
+    np.testing.assert_array_equal(ram, (ids[:, None] + np.arange(8)).astype(np.uint8))
+    np.testing.assert_array_equal(np.concatenate([b["action"] for b in batches]), ids)
+    rewards = np.concatenate([b["reward"] for b in batches])
+    assert rewards.dtype == np.float32
+    np.testing.assert_array_equal(rewards, ids / 2)
+    dones = np.concatenate([b["done"] for b in batches])
+    np.testing.assert_array_equal(dones, ids % 7 == 0)
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_shuffled_batches_cover_every_record(tmp_path, compression):
+    _write(tmp_path, compression)
+    reader = TrajectoryReader(tmp_path)
+    batches = list(reader.iter_batches(64, shuffle=True, seed=1, drop_last=True))
+    assert all(len(b["action"]) == 64 for b in batches)
+    ids = np.concatenate([b["obs.id"] for b in batches])
+    assert len(np.unique(ids)) == len(ids) == 192
+
+
+def test_raw_chunks_are_memory_mapped(tmp_path):
+    _write(tmp_path, None)
+    assert isinstance(TrajectoryReader(tmp_path).load_chunk(0)["obs.ram"], np.memmap)
+
+
+def test_appending_continues_numbering(tmp_path):
+    _write(tmp_path, None, records=150)
+    _write(tmp_path, None, records=50)
+    assert len(TrajectoryReader(tmp_path)) == 200
+
+
+def test_appending_after_interrupted_write(tmp_path):
+    _write(tmp_path, None, records=100)
+    os.makedirs(tmp_path / ".chunk-000001.tmp")
+    _write(tmp_path, None, records=50)
+    assert not (tmp_path / ".chunk-000001.tmp").exists()
+    assert len(TrajectoryReader(tmp_path)) == 150
+
+
+def test_appending_after_numbering_gap(tmp_path):
+    _write(tmp_path, None, records=300)
+    shutil.rmtree(tmp_path / "chunk-000001")
+    _write(tmp_path, None, records=100)
+    reader = TrajectoryReader(tmp_path)
+    assert [os.path.basename(c) for c in reader.chunks] == [
+        "chunk-000000",
+        "chunk-000002",
+        "chunk-000003",
+    ]
+    assert len(reader) == 300
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from pokemon_emulator import POKEMON_RED_BLUE, AddressIndex, Field
+from pokemon_emulator.gamestate import index_for_rom, rom_title
+
+WINDOW = (0xC000, 0xE000)
+
+
+def _ram(n=3):
+    return np.zeros((n, WINDOW[1] - WINDOW[0]), dtype=np.uint8)
+
+
+def _poke(ram, row, address, values):
+    ram[row, address - WINDOW[0] : address - WINDOW[0] + len(values)] = values
+
+
+def test_decodes_each_kind():
+    index = AddressIndex(
+        "synthetic",
+        {
+            "a": Field(0xC010),
+            "hp": Field(0xC100, "u16be", count=3, stride=4),
+            "money": Field(0xC200, "bcd3"),
+        },
+    )
+    ram = _ram()
+    _poke(ram, 0, 0xC010, [7])
+    _poke(ram, 1, 0xC100, [0x01, 0x2C, 0, 0, 0xFF, 0xFF])
+    _poke(ram, 1, 0xC108, [0x00, 0x05])
+    _poke(ram, 2, 0xC200, [0x99, 0x87, 0x65])
+
+    state = index.decoder(WINDOW).decode(ram)
+
+    np.testing.assert_array_equal(state["a"], [7, 0, 0])
+    np.testing.assert_array_equal(state["hp"][1], [300, 65535, 5])
+    np.testing.assert_array_equal(state["money"], [0, 0, 998765])
+    assert state["a"].shape == (3,)
+    assert state["hp"].shape == (3, 3)
+
+
+def test_red_blue_party_fields():
+    ram = _ram(2)
+    _poke(ram, 1, 0xD163, [2])
+    _poke(ram, 1, 0xD16B + 44 + 0x01, [0x00, 0x2A])
+    _poke(ram, 1, 0xD16B + 44 + 0x21, [12])
+    _poke(ram, 1, 0xD347, [0x01, 0x23, 0x45])
+
+    start, stop = POKEMON_RED_BLUE.span
+    narrowed = ram[:, start - WINDOW[0] : stop - WINDOW[0]]
+    state = POKEMON_RED_BLUE.decoder((start, stop)).decode(narrowed)
+
+    assert state["party.count"].tolist() == [0, 2]
+    assert state["party.hp"][1].tolist() == [0, 42, 0, 0, 0, 0]
+    assert state["party.level"][1, 1] == 12
+    assert state["inventory.money"].tolist() == [0, 12345]
+
+
+def test_rejects_fields_outside_window():
+    index = AddressIndex("synthetic", {"x": Field(0xBFFF, "u16be")})
+    with pytest.raises(ValueError, match="outside RAM window"):
+        index.decoder(WINDOW)
+
+
+def test_rom_title_reads_header_without_caching(rom, tmp_path):
+    assert rom_title(rom) == "PKEBENCH"
+    with pytest.raises(ValueError, match="PKEBENCH"):
+        index_for_rom(rom)
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+
+from pokemon_emulator import BatchedEmulator, JsonlExporter, Profiler
+
+
+def _run(emu, steps):
+    actions = np.zeros(emu.num_instances, dtype=np.uint8)
+    for step in range(steps):
+        emu.step(actions, render=step % 2 == 0)
+
+
+def test_non_allocating_step_reports_no_allocations(rom):
+    profiler = Profiler()
+    with BatchedEmulator(rom, 2, ram_window=(0xC000, 0xC100), profiler=profiler) as emu:
+        _run(emu, 3)
+        profiler.reset()
+        _run(emu, 200)
+    report = profiler.report()
+    assert abs(report["alloc_blocks_per_step"]) < 0.05
+    assert report["steps"] == 200
+    assert report["frames"] == 400
+    assert abs(report["clock_cycles_per_frame"] - 70224) < 700
+    assert set(report["section_s"]) == {"emulate", "render", "observe"}
+
+
+def test_allocations_in_the_loop_are_counted(rom):
+    profiler = Profiler()
+    leaked = []
+    with BatchedEmulator(rom, 1, ram_window=(0xC000, 0xC100), profiler=profiler) as emu:
+        _run(emu, 3)
+        inst = emu._instances[0]
+        tick = inst.tick
+        inst.tick = lambda *args: (leaked.append(object()), tick(*args))
+        profiler.reset()
+        _run(emu, 100)
+    assert profiler.report()["alloc_blocks_per_step"] >= 1
+
+
+def test_disabled_profiler_counts_nothing(rom):
+    profiler = Profiler(enabled=False)
+    with BatchedEmulator(rom, 1, ram_window=(0xC000, 0xC100), profiler=profiler) as emu:
+        _run(emu, 10)
+        with profiler.section("policy"):
+            pass
+    report = profiler.report()
+    assert report["steps"] == 0
+    assert report["section_s"] == {}
+
+
+def test_export_hook_writes_windowed_reports(rom, tmp_path):
+    path = tmp_path / "profile.jsonl"
+    profiler = Profiler()
+    profiler.add_export_hook(JsonlExporter(path), interval=0.0)
+    with BatchedEmulator(rom, 1, ram_window=(0xC000, 0xC100), profiler=profiler) as emu:
+        _run(emu, 5)
+    reports = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(reports) == 5
+    assert all(report["steps"] == 1 for report in reports)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from pokemon_emulator import (
+    WRAM_START,
+    WRAM_STOP,
+    BatchedEmulator,
+    Replay,
+    ReplayPlayer,
+    ReplayRecorder,
+)
+
+WRAM = (WRAM_START, WRAM_STOP)
+
+
+@pytest.fixture
+def recording(rom, tmp_path):
+    """A replay of instance 1 and that instance's live RAM after each step."""
+    path = tmp_path / "run.rep"
+    rng = np.random.default_rng(0)
+    live = {}
+    with BatchedEmulator(rom, 2, ram_window=WRAM, frame_skip=3, render=False) as emu:
+        emu.step(np.array([5, 9], dtype=np.uint8))
+        with ReplayRecorder(path, emu, instance=1, keyframe_interval=30) as rec:
+            for step in range(100):
+                if step % 5 == 0:
+                    actions = rng.integers(0, 256, 2, dtype=np.uint8)
+                frames = 1 + step % 4 if step % 10 == 9 else None
+                obs = emu.step(actions, frames=frames)
+                rec.record(actions[1], frames)
+                live[rec.frame_count] = obs.ram[1].copy()
+    return path, live
+
+
+def test_seek_matches_live_ram(rom, recording):
+    path, live = recording
+    with Replay(path) as replay, ReplayPlayer(replay, rom, ram_window=WRAM) as player:
+        keyframes = [f for f in replay.keyframe_frames if f in live]
+        between = [f for f in live if f not in replay.keyframe_frames]
+        assert keyframes and between
+        for frame in [*keyframes, *between[::7], max(live)]:
+            np.testing.assert_array_equal(player.seek(frame).ram[0], live[frame])
+
+
+def test_step_matches_live_ram(rom, recording):
+    path, live = recording
+    with Replay(path) as replay, ReplayPlayer(replay, rom, ram_window=WRAM) as player:
+        player.seek(0)
+        for frame in range(1, replay.frame_count + 1):
+            obs = player.step()
+            if frame in live:
+                np.testing.assert_array_equal(obs.ram[0], live[frame])
+        with pytest.raises(EOFError):
+            player.step()
+
+
+def test_seek_is_bounded_by_keyframes(recording):
+    path, live = recording
+    with Replay(path) as replay:
+        assert len(replay) == max(live)
+        gaps = np.diff([*replay.keyframe_frames, len(replay)])
+        assert gaps.max() < replay.keyframe_interval + 4
+
+
+def test_rendered_seek_to_keyframe(rom, recording):
+    path, _ = recording
+    with Replay(path) as replay, ReplayPlayer(replay, rom) as player:
+        frame = replay.keyframe_frames[1]
+        rendered = player.seek(frame, render=True).frames.copy()
+        player.seek(frame - 1)
+        np.testing.assert_array_equal(player.step(render=True).frames, rendered)
+        with pytest.raises(ValueError):
+            player.seek(0, render=True)
+        with pytest.raises(IndexError):
+            player.seek(len(replay) + 1, render=True)
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pokemon_emulator
+from pokemon_emulator import RomData
+
+# "RHYDON" and "KANGASKHAN" in the Generation I charset, 0x50-terminated.
+_RHYDON = bytes([0x91, 0x87, 0x98, 0x83, 0x8E, 0x8D, 0x50, 0x50, 0x50, 0x50])
+_KANGASKHAN = bytes([0x8A, 0x80, 0x8D, 0x86, 0x80, 0x92, 0x8A, 0x87, 0x80, 0x8D])
+
+
+@pytest.fixture
+def red_rom(tmp_path):
+    rom = bytearray(0x20000)
+    rom[0x134:0x13F] = b"POKEMON RED"
+    rom[0x147] = 0x13  # MBC3+RAM+BATTERY
+    rom[0x148] = 0x02  # 8 banks
+    rom[0x149] = 0x03  # 4 RAM banks
+    rom[0x1C21E:0x1C228] = _RHYDON
+    rom[0x1C228:0x1C232] = _KANGASKHAN
+    path = tmp_path / "red.gb"
+    path.write_bytes(rom)
+    return path
+
+
+def test_header_banks_and_species_names(red_rom):
+    rom = RomData(red_rom, cache=False)
+    assert rom.header["title"] == "POKEMON RED"
+    assert rom.header["mbc"] == "MBC3"
+    assert rom.header["rom_banks"] == 8
+    assert rom.header["ram_banks"] == 4
+    assert [bank["offset"] for bank in rom.banks] == [i * 0x4000 for i in range(8)]
+    assert rom.banks[1]["free"] == 0x4000
+    assert rom.species_names[:2] == ["RHYDON", "KANGASKHAN"]
+    assert len(rom.species_names) == 190
+
+
+def test_tables_are_cached_on_disk(red_rom, tmp_path):
+    cache = tmp_path / "tables"
+    assert RomData(red_rom, cache).species_names[0] == "RHYDON"
+    (path,) = cache.iterdir()
+    data = json.loads(path.read_text())
+    data["tables"]["species_names"][0] = "CACHED"
+    path.write_text(json.dumps(data))
+
+    assert RomData(red_rom, cache).species_names[0] == "CACHED"
+    data["version"] = -1
+    path.write_text(json.dumps(data))
+    assert RomData(red_rom, cache).species_names[0] == "RHYDON"
+
+
+def test_unknown_table(red_rom):
+    with pytest.raises(KeyError):
+        RomData(red_rom, cache=False).table("moves")
+
+
+def test_package_import_is_lazy():
+    code = (
+        "import sys, pokemon_emulator; "
+        "assert 'pyboy' not in sys.modules; "
+        "assert 'pokemon_emulator.core' not in sys.modules"
+    )
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(pokemon_emulator.__path__[0])}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        pokemon_emulator.NoSuchThing
+    assert "BatchedEmulator" in dir(pokemon_emulator)
@@ -0,0 +1,72 @@
+import glob
+
+import numpy as np
+import pytest
+
+from pokemon_emulator import WRAM_START, WRAM_STOP, BatchedEmulator, VectorEmulator
+
+WRAM = (WRAM_START, WRAM_STOP)
+
+
+def test_sync_matches_batched(rom):
+    rng = np.random.default_rng(0)
+    with BatchedEmulator(rom, 4, ram_window=WRAM) as emu, VectorEmulator(
+        rom, 4, 2, ram_window=WRAM
+    ) as env:
+        # Run past the boot ROM (about 60 frames) so RAM is not still blank.
+        for _ in range(80):
+            actions = rng.integers(0, 256, 4, dtype=np.uint8)
+            expected, got = emu.step(actions), env.step(actions)
+        np.testing.assert_array_equal(got.ram, expected.ram)
+        np.testing.assert_array_equal(got.frames, expected.frames)
+
+
+def test_failed_start_frees_shared_memory(tmp_path):
+    before = set(glob.glob("/dev/shm/psm_*"))
+    with pytest.raises(RuntimeError, match="worker failed"):
+        VectorEmulator(tmp_path / "missing.gb", 4, 2)
+    assert set(glob.glob("/dev/shm/psm_*")) <= before
+
+
+@pytest.mark.parametrize("ids", [[0, 0, 1], [0, 1, 4], [-1, 0, 1]])
+def test_send_rejects_bad_instance_ids(rom, ids):
+    with VectorEmulator(rom, 4, 2, mode="async") as env:
+        with pytest.raises(ValueError):
+            env.send(np.zeros(len(ids), dtype=np.uint8), ids)
+
+
+def test_async_returns_stepped_shards(rom):
+    with VectorEmulator(rom, 4, 2, mode="async", batch_workers=2) as env:
+        env.send(np.zeros(4, dtype=np.uint8), np.arange(4))
+        ids, obs = env.recv()
+        assert sorted(ids.tolist()) == [0, 1, 2, 3]
+        assert obs.ram.shape[0] == 4
+
+
+def test_failed_step_drains_every_reply(rom, monkeypatch):
+    rng = np.random.default_rng(0)
+    with BatchedEmulator(rom, 4, ram_window=WRAM) as emu, VectorEmulator(
+        rom, 4, 2, ram_window=WRAM
+    ) as env:
+        for _ in range(80):
+            actions = rng.integers(0, 256, 4, dtype=np.uint8)
+            emu.step(actions)
+            env.step(actions)
+        conns = env._conns
+        original = conns[0].recv
+
+        def failing_recv():
+            original()
+            return "injected failure"
+
+        monkeypatch.setattr(conns[0], "recv", failing_recv, raising=False)
+        actions = rng.integers(0, 256, 4, dtype=np.uint8)
+        with pytest.raises(RuntimeError, match="injected failure"):
+            env.step(actions)
+        emu.step(actions)
+        assert not conns[1].poll()
+        monkeypatch.undo()
+
+        for _ in range(3):
+            actions = rng.integers(0, 256, 4, dtype=np.uint8)
+            np.testing.assert_array_equal(env.step(actions).ram, emu.step(actions).ram)